@@ -27,6 +27,7 @@ if TYPE_CHECKING:
     from Rules.PlacementRules import PlacementRules
 
 from Magic.MagicTerminal_utils import *
+import copy
 
 class Cell:
     """Class to store the cell-view of a device.
@@ -97,6 +98,21 @@ class Cell:
         """
         self._path = path
 
+    def clone_geometry(self) -> Cell:
+        """Get a lightweight copy of the cell, to transform its geometry
+            without modifying the cell. Only the bounding-layer gets copied, all 
+            other attributes (e.g. device, path) are shared with the cell, and 
+            the copy has no terminals.
+
+        Returns:
+            Cell: Copy of the cells geometry.
+        """
+        clone = copy.copy(self)
+        clone._layer_stack = {"Bounding" : copy.deepcopy(self._layer_stack["Bounding"])}
+        clone._terminals = {}
+        clone._features = dict(self._features)
+        return clone
+
     def set_name(self, name : str):
         """Set the name of the cell.
 
@@ -548,10 +564,12 @@ class Cell:
         self._layer_stack["Bounding"].rotate(coordinate, angle)
         self._rotation += angle % 360
 
-        #rotate the terminals
+        #rotate the pins of all terminals at once
+        pins = []
         for (name, term) in self._terminals.items():
             assert isinstance(term, MagicTerminal)
-            term.rotate_by(coordinate, -angle)
+            pins.extend(term.pins)
+        MagicPin.rotate_pins(pins, coordinate, -angle)
 
 
     def rotate_center(self, angle : int):
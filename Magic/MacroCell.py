@@ -61,6 +61,17 @@ class MacroCell(Cell):
     def cells(self):
         return self._cells
     
+    def clone_geometry(self) -> MacroCell:
+        """Get a lightweight copy of the macro-cell, and its internal cells,
+            to transform their geometry without modifying the cells.
+
+        Returns:
+            MacroCell: Copy of the macro-cells geometry.
+        """
+        clone = super().clone_geometry()
+        clone._cells = [c.clone_geometry() for c in self._cells]
+        return clone
+    
     def get_cells_bound_layer(self) -> dict[str, MagicLayer]:
         """Get the bounding layer defined by the bounding box over all cells of the MacroCell.
 
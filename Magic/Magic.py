@@ -23,6 +23,7 @@ if TYPE_CHECKING:
     from SchematicCapture.Circuit import Circuit
     from SchematicCapture.Primitives import DifferentialPair
     from SchematicCapture.Devices import MOS, ThreeTermResistor, Capacitor
+    from Magic.Cell import Cell
 
 from SchematicCapture.Devices import SubDevice, PrimitiveDevice
 
@@ -338,12 +339,14 @@ class Magic:
     
     
     @staticmethod
-    def place_device(d : PrimitiveDevice) -> str:
+    def place_device(d : PrimitiveDevice, cell : Cell = None) -> str:
         """
             Place the device in magic.
 
         Args:
             d (PrimitiveDevice): Device which shall be placed.
+            cell (Cell, optional): Cell-view which shall be used to place the device. 
+                                    Defaults to None, to use the cell of the device.
         
         Raises:
             ValueError: If the device has no cell-view.
@@ -353,11 +356,12 @@ class Magic:
         Returns:
             str: Command to place the devices cell.
         """
-        #check if the device has a cell-view
-        if d.cell is None:
-            raise ValueError(f"Cell view of device {d.name} not available!")
-        
-        cell = d.cell
+        if cell is None:
+            #check if the device has a cell-view
+            if d.cell is None:
+                raise ValueError(f"Cell view of device {d.name} not available!")
+            
+            cell = d.cell
         
         if cell.path:
             #if os.path.isfile(cell.path):
@@ -410,63 +414,83 @@ class Magic:
         #    command.append(f"flatten -doinplace")
         return command
     
-    def place_circuit(self, name : str, path='Magic/Placement/') -> list[str]:
+    def place_circuit(self, name : str, path='Magic/Placement/', cells : dict[str, Cell] = None, batch = False) -> list[str]:
         """Generates the commands to place the placed cells of the circuit.
 
         Args:
             name (str): Name of the top-cell and .mag file.
             path (str): Path of the resulting placement.
+            cells (dict[str, Cell], optional): Cell-views which shall be used instead of the devices cells. 
+                                                key: Name of the device, value: Cell. Defaults to None.
+            batch (bool, optional): If True, the commands can be chained with other placements in a single 
+                                    magic session. (The top-cell gets loaded as new cell, and magic doesn't quit.)
+                                    Defaults to False.
         Returns:
             list[str]: Commands to place devices.
         """
         commands = []
+        if batch:
+            #start a new cell, since the session already holds a top-cell
+            commands.append(f"load {path}{name} -silent -quiet")
         commands.append(f"save {path}{name}")
 
         #for (d_name, d) in self._circuit.devices.items():
         #    if d.cell.placed:
         #        commands.extend(Magic.place_device(d))
         
-        commands.extend(Magic._place_all_cells(self._circuit))
+        commands.extend(Magic._place_all_cells(self._circuit, cells))
         commands.append("select top cell")
         commands.append("save")
-        commands.append("quit -noprompt")
+        if not batch:
+            commands.append("quit -noprompt")
         
         return commands
 
     @staticmethod
-    def _place_all_cells(circ : Circuit) -> list[str]:
+    def _place_all_cells(circ : Circuit, cells : dict[str, Cell] = None) -> list[str]:
         """Place all cells of Circuit <circ>.
 
         Args:
             circ (Circuit): Circuit which shall be placed.
+            cells (dict[str, Cell], optional): Cell-views which shall be used instead of the devices cells. 
+                                                key: Name of the device, value: Cell. Defaults to None.
 
         Returns:
             list[str]: Commands to place the circuit.
         """
+        if cells is None:
+            cells = {}
+
         commands = []
         #iterate over the devices
         for (d_name, d) in circ.devices.items():
             if type(d) is SubDevice:
                 try:
                     #try to place the subdevice as a macrocell
-                    commands.extend(Magic.place_device(d))
+                    commands.extend(Magic.place_device(d, cells.get(d_name)))
                 except:
                     #flat the cell and place all devices separate
-                    commands.extend(Magic._place_all_cells(d._circuit))
+                    commands.extend(Magic._place_all_cells(d._circuit, cells))
             else:
-                commands.extend(Magic.place_device(d))
+                commands.extend(Magic.place_device(d, cells.get(d_name)))
         return commands
     
-    def gen_devices(self) -> str:
+    def gen_devices(self, quit = True, subset : set[str] = None) -> list[str]:
         """Generate the devices for the circuit.
 
+        Args:
+            quit (bool, optional): If True, magic quits after the devices are generated.
+                                    Set to False, to generate the devices of multiple circuits
+                                    in a single magic session. Defaults to True.
+            subset (set[str], optional): Names of the devices which shall be generated. 
+                                        Defaults to None, to generate all devices of the circuit.
         Returns:
-            str: Commands to generate devices for the circuit.
+            list[str]: Commands to generate devices for the circuit.
         """
         commands = []
         
         for (d_name, d) in self._circuit.devices.items():
-            if type(d) != SubDevice:
+            if type(d) != SubDevice and (subset is None or d_name in subset):
                 commands.append(f"load {d_name} -silent -quiet")
                 commands.append("box 0 0 0 0")
                 commands.append(Magic.magic_gen_device(d))
@@ -474,7 +498,8 @@ class Magic:
                 commands.append(f"save {d_name}")
                 #commands.append("writeall force")
         
-        commands.append("quit -noprompt")
+        if quit:
+            commands.append("quit -noprompt")
             
         return commands
     
@@ -20,7 +20,6 @@
 from __future__ import annotations
 
 import pygame
-import copy
 import numpy as np
 from PDK.Layers import Layer
 from PDK.PDK import PDK
@@ -185,6 +184,54 @@ class Rectangle:
         else:
             raise ValueError("Only angles multiple of 90deg are supported!")
     
+    def set_coordinates(self, x0 : int|float, y0 : int|float, x1 : int|float, y1 : int|float):
+        """Set the coordinates of the rectangle.
+
+        Args:
+            x0 (int | float): Min. x coordinate.
+            y0 (int | float): Min. y coordinate.
+            x1 (int | float): Max. x coordinate.
+            y1 (int | float): Max. y coordinate.
+        """
+        self._x0 = min(x0,x1)
+        self._x1 = max(x1, x0)
+        self._y0 = min(y0, y1)
+        self._y1 = max(y1, y0)
+
+    @staticmethod
+    def rotate_points(points : np.ndarray, mean_coordinate : tuple[int|float, int|float], angle : int) -> np.ndarray:
+        """Rotate the points <points> around <mean_coordinate> counter-clockwise,
+            by the amount of <angle>. All points get rotated at once, 
+            the same way as the corners in Rectangle.rotate.
+
+        Args:
+            points (np.ndarray): Array of shape (n, 2), with a row (x, y) per point.
+            mean_coordinate (tuple): center-point of the rotation
+            angle (int): rotation angle, multiples of 90deg
+
+        Raises:
+            ValueError: If the angle isn't multiple of 90deg.
+
+        Returns:
+            np.ndarray: Array of shape (n, 2) with the rotated points.
+        """
+        if angle%90 != 0:
+            raise ValueError("Only angles multiple of 90deg are supported!")
+        
+        mean = np.array(mean_coordinate, dtype=float)
+
+        #transform the angle in rad
+        angle = angle * np.pi/180
+        cos, sin = np.cos(angle), np.sin(angle)
+
+        #rotate the vectors from the rotation-center to the points
+        v = np.asarray(points, dtype=float) - mean
+        rotated = np.empty_like(v)
+        rotated[:, 0] = cos*v[:, 0] - sin*v[:, 1]
+        rotated[:, 1] = sin*v[:, 0] + cos*v[:, 1]
+
+        return np.round(rotated, 2) + mean
+
     @staticmethod
     def overlap(R1 : Rectangle, R2 : Rectangle) -> bool:
         """Checks if R1 and R2 overlap.
@@ -314,8 +361,11 @@ class MagicLayer:
             color (Color): Color of the layer.
         """
         self._name = name
-        self._rects : list[Rectangle]
-        self._rects = []
+        #store the rectangles as array, with a row (x0, y0, x1, y1) per rectangle
+        self._coords = np.empty((0,4))
+        #store rectangles which were added, but aren't in the array yet
+        self._new_rects : list[list[float|int]]
+        self._new_rects = []
         self._color = color
         self._fill = True
 
@@ -325,6 +375,20 @@ class MagicLayer:
     def __eq__(self, __value: object) -> bool:
         return (isinstance(__value, MagicLayer)) and (self._name == __value._name)
 
+    def __setstate__(self, state : dict):
+        """Restore a pickled layer.
+            Layers pickled by older versions store a list of rectangles, 
+            which gets converted into the coordinate array.
+
+        Args:
+            state (dict): Pickled attributes of the layer.
+        """
+        rects = state.pop("_rects", None)
+        self.__dict__.update(state)
+        if not (rects is None):
+            self._coords = np.empty((0,4))
+            self._new_rects = [r.get_coordinates() for r in rects]
+
     def __hash__(self) -> int:
         return hash(self._name)
     
@@ -355,14 +419,30 @@ class MagicLayer:
         """
         return self._rotation%360
 
+    @property
+    def coordinates(self) -> np.ndarray:
+        """Get the coordinates of the rectangles of the layer.
+
+        Returns:
+            np.ndarray: Array of shape (n, 4), with a row (x0, y0, x1, y1) per rectangle.
+        """
+        if self._new_rects:
+            #append the added rectangles at once
+            new_coords = np.array(self._new_rects, dtype=float)
+            self._coords = np.vstack((self._coords, new_coords)) if len(self._coords) else new_coords
+            self._new_rects = []
+        return self._coords
+
     @property
     def rectangles(self) -> list[Rectangle]:
         """Get the rectangles of the layer.
+            The rectangles are generated from the coordinates of the layer, 
+            modifying them doesn't change the layer.
 
         Returns:
             list[Rectangle]: List of rectangles.
         """
-        return self._rects
+        return [Rectangle(*c) for c in self.coordinates.tolist()]
     
     def dont_fill(self):
         """Set the fill-attribute to False.
@@ -375,7 +455,7 @@ class MagicLayer:
         Args:
             rect (Rectangle): Rectangle which shall be added.
         """
-        self._rects.append(rect)
+        self._new_rects.append(rect.get_coordinates())
     
     def move(self, coordinate : tuple[float|int, float|int]):
         """Move the rectangles of the layer by the amount given 
@@ -384,8 +464,9 @@ class MagicLayer:
         Args:
             coordinate (tuple[float | int, float | int]): (dx, dy) Defines the movement in x and y direction.
         """
-        for r in self._rects:
-            r.move(coordinate)
+        coords = self.coordinates
+        coords[:, 0::2] += coordinate[0]
+        coords[:, 1::2] += coordinate[1]
         
     def draw(self, surface : pygame.Surface):
         """Draw the layer on an pygame surface.
@@ -393,8 +474,8 @@ class MagicLayer:
         Args:
             surface (pygame.Surface): Surface in which the layer shall be drawn.
         """
-        for r in self._rects:
-            pygame.draw.rect(surface, self._color.rgb, copy.copy(r.to_pygame()), 0 if self._fill else 5)
+        for r in self.rectangles:
+            pygame.draw.rect(surface, self._color.rgb, r.to_pygame(), 0 if self._fill else 5)
     
     def get_bounding_box(self) -> list[int|float]:
         """Get the bounding box of the layer.
@@ -409,15 +490,12 @@ class MagicLayer:
         Returns:
             list[int|float]: (x0, y0, x1, y1)
         """
-        bounding = self._rects[0].get_coordinates()
-        for r in self._rects:
-            r_bound = r.get_coordinates()
-            for i in range(2):
-                bounding[i] = min(bounding[i], r_bound[i])
-            
-            for i in range(2,4):
-                bounding[i] = max(bounding[i], r_bound[i])
-        return bounding
+        coords = self.coordinates
+        if len(coords) == 0:
+            raise IndexError(f"Layer {self._name} has no rectangles!")
+        
+        bounding = np.concatenate((coords[:, :2].min(axis=0), coords[:, 2:].max(axis=0)))
+        return bounding.tolist()
     
     def rotate(self, mean_coordinate : tuple[float|int], angle : int):
         """Rotate the layer clock-wise by the angle <angle>, around <mean_coordinate>.
@@ -426,10 +504,17 @@ class MagicLayer:
             mean_coordinate (tuple): mean-coordinate of the rotation
             angle (int): Rotation angle, multiple of 90deg
         """
-        for r in self._rects:
-            #rotate each rectangle around the mean-coordinate, clock-wise 
-            r.rotate(mean_coordinate, -angle)
-        
+        if angle%90 != 0:
+            raise ValueError("Only angles multiple of 90deg are supported!")
+
+        #rotate both corners of all rectangles at once, clock-wise
+        coords = self.coordinates
+        rotated = Rectangle.rotate_points(coords.reshape(-1, 2), mean_coordinate, -angle).reshape(-1, 2, 2)
+
+        #retrieve the new bounding-box coordinates of the rectangles
+        coords[:, 0:2] = rotated.min(axis=1)
+        coords[:, 2:4] = rotated.max(axis=1)
+
         #track the rotation of the layer
         self._rotation += angle%360
 
@@ -78,38 +78,39 @@ class MagicParser:
             dict[str, MagicLayer]: key: Name of the layer (as in the .mag file). value: MagicLayer
         """
         layers = {}
-        
-        n = 0
-        #iterate over the lines
-        while n<len(lines):
-            l = lines[n]
+
+        #layer of the rectangles in the following lines
+        layer = None
+
+        #iterate over the lines in a single pass
+        for l in lines:
+            if l.startswith("rect"):
+                #rectangles belong to the layer, if they directly follow its definition 
+                if layer is not None:
+                    layer.add_rect(self.get_rect(l))
+                continue
+            
+            #every other line ends the rectangles of the layer
+            layer = None
+            
+            #if a new layer were defined
+            if l.startswith("<<"):
+                layer_name = MagicParser.get_layer(l)
+                if layer_name:
+                    #set a random color for this layer
+                    color = Color((np.random.randint(0, 255),np.random.randint(0, 255), np.random.randint(0, 255)))
+                    
+                    #generate a MagicLayer for this layer
+                    layer = MagicLayer(layer_name, color)
+                    layers[layer.name] = layer
 
             #check if the file uses another scale 
-            if l.startswith("magscale"):
+            elif l.startswith("magscale"):
                 splitted = l.split()
                 self._magscale = int(splitted[2])
 
-            #if a new layer were defined
-            if MagicParser.get_layer(l): 
-                #set a random color for this layer
-                color = Color((np.random.randint(0, 255),np.random.randint(0, 255), np.random.randint(0, 255)))
-                
-                #generate a MagicLayer for this layer
-                layer = MagicLayer(MagicParser.get_layer(l), color)
-                n += 1
-                #get the defined rectangles on this layer
-                rect = self.get_rect(lines[n])
-                while rect:
-                    layer.add_rect(rect)
-                    n+=1
-                    rect = self.get_rect(lines[n])
-                
-                n -= 1
-                layers[layer.name] = layer
-            n += 1
         return layers
             
-            
     @staticmethod
     def get_layer(line : str) -> str | bool | None:
         """Get the name of the layer, defined in line <line>.
@@ -200,33 +200,48 @@ class MagicPin:
         Raises:
             ValueError: If angle is not a multiple of 90degree.
         """
-        if angle%90 == 0:
-            
-            self._rotation += angle
-
-            #rotate the bounding box of the pin.
-            if self._bounding_box:
-                self._bounding_box.rotate(coordinate, angle)
-            
-            #rotate the x,y coordinate of the pin.
-            mean = np.array(coordinate)
-            c = np.array([self._x, self._y])
-            
-            angle = angle * np.pi/180
-            rot_mat = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
-            
-            v = c-mean
-            
-            v = np.round(rot_mat.dot(v),2)
-            
-            c_new = v + mean
-
-            self._x = c_new[0]
-            self._y = c_new[1]
-
-
-        else:
+        MagicPin.rotate_pins([self], coordinate, angle)
+
+    @staticmethod
+    def rotate_pins(pins : list[MagicPin], coordinate : tuple[float, float], angle : int):
+        """Rotate the pins <pins>, counter-clockwise, around the coordinate <coordinate>,
+        by the amount of angle. The coordinates and bounding boxes of all pins
+        get rotated at once.
+
+        Args:
+            pins (list[MagicPin]): Pins which shall be rotated.
+            coordinate (tuple): (x,y) coordinate of the rotation-point.
+            angle (int): Rotation angle, multiple of 90degree.
+
+        Raises:
+            ValueError: If angle is not a multiple of 90degree.
+        """
+        if angle%90 != 0:
             raise ValueError("Only angles multiple of 90deg are supported!")
+        
+        if not pins:
+            return
+        
+        #collect the x,y coordinates of the pins, and the corners of their bounding boxes
+        points = []
+        for pin in pins:
+            points.append((pin._x, pin._y))
+            if pin._bounding_box:
+                c = pin._bounding_box.get_coordinates()
+                points.append((c[0], c[1]))
+                points.append((c[2], c[3]))
+        
+        rotated = Rectangle.rotate_points(points, coordinate, angle).tolist()
+
+        #store the rotated coordinates
+        i = 0
+        for pin in pins:
+            pin._rotation += angle
+            (pin._x, pin._y) = rotated[i]
+            i += 1
+            if pin._bounding_box:
+                pin._bounding_box.set_coordinates(*rotated[i], *rotated[i+1])
+                i += 2
 
     def plot(self, ax, color=None, text=True):
         """Plot the pin on axis <ax>.
@@ -366,8 +381,7 @@ class MagicTerminal:
             angle (int): Rotation-angle multiple of 90deg.
         """
         try:
-            for pin in self._pins:
-                pin.rotate_by(coordinate, angle)
+            MagicPin.rotate_pins(self._pins, coordinate, angle)
         except:
             ValueError("Rotation angle must be multiple of 90deg!")
     
@@ -96,7 +96,7 @@ shift $((OPTIND-1))
 
 [ ! -d "$RESDIR" ] && mkdir -p "$RESDIR"
 if [ $RUN_CLEAN -eq 1 ]; then
-	rm -- -f "$RESDIR"/*.magic.*.rpt
+	rm -f -- "$RESDIR"/*.magic.*.rpt
 fi 
 
 # define useful variables
@@ -19,24 +19,129 @@
 
 from __future__ import annotations
 from typing import TYPE_CHECKING
-    
 
 from Magic.Magic import Magic
 from Magic.MagicParser import MagicParser
 from Magic.Cell import Cell
 
 from SchematicCapture.Circuit import Circuit, SubCircuit
-from SchematicCapture.utils import get_top_down_topology, get_bottom_up_topology
-from SchematicCapture.Devices import SubDevice
+from SchematicCapture.utils import get_precomputed_topology
+from SchematicCapture.Devices import SubDevice, Device
 
+from concurrent.futures import ThreadPoolExecutor
 import copy
+import functools
 import os
-import shutil
-import sys
 import logging
+import subprocess
 
 logger = logging.getLogger(__name__)
 
+def _realpath(path : str) -> str:
+    """Get the canonical path of <path>.
+        The result is cached for the current working directory.
+
+    Args:
+        path (str): Path to be resolved.
+
+    Returns:
+        str: Canonical path.
+    """
+    return _cached_realpath(os.getcwd(), path)
+
+@functools.lru_cache(maxsize=64)
+def _cached_realpath(cwd : str, path : str) -> str:
+    """Get the canonical path of <path>, relative to the directory <cwd>.
+        The result is cached, and can get stale, if a symlink in the path
+        gets retargeted while the process is running.
+
+    Args:
+        cwd (str): Directory to which <path> is relative.
+        path (str): Path to be resolved.
+
+    Returns:
+        str: Canonical path.
+    """
+    return os.path.realpath(os.path.join(cwd, path))
+
+def _write_tcl_script(lines : list[str], path : str, script : str):
+    """Write the commands <lines> into the tcl script <path>/<script>.
+
+    Args:
+        lines (list[str]): Commands of the script.
+        path (str): Path where the script gets stored.
+        script (str): File name of the tcl script.
+    """
+    with open(f'{path}/{script}', 'w') as file:
+        file.write("\n".join(lines) + "\n")
+
+def _start_magic(lines : list[str], path : str, script : str) -> subprocess.Popen:
+    """Start a (batch) session of magic, which executes the commands <lines>.
+        The session runs in the background, so other work can be done
+        until the session gets awaited by _wait_magic.
+
+    Args:
+        lines (list[str]): Commands which shall be executed.
+        path (str): Path in which magic shall be executed, and the script gets stored.
+        script (str): File name of the tcl script.
+
+    Raises:
+        KeyError: If the variable PDKPATH isn't set.
+
+    Returns:
+        subprocess.Popen: Running magic process.
+    """
+    # check if the variable PDKPATH is set
+    if not ("PDKPATH" in os.environ):
+        raise KeyError(f"[ERROR] Variable PDKPATH not set!")
+
+    _write_tcl_script(lines, path, script)
+
+    #run magic in <path>, without changing the working directory of the process
+    rcfile = f'{os.environ["PDKPATH"]}/libs.tech/magic/sky130A.magicrc'
+    return subprocess.Popen(['magic', '-dnull', '-noconsole', '-rcfile', rcfile, script], cwd=path, stdout=subprocess.DEVNULL)
+
+def _wait_magic(process : subprocess.Popen, path : str, script : str, remove_script = False):
+    """Wait until the magic session <process> finished.
+
+    Args:
+        process (subprocess.Popen): Magic process started by _start_magic.
+        path (str): Path in which magic has been executed.
+        script (str): File name of the tcl script.
+        remove_script (bool, optional): If True, the script will be deleted after the execution. Defaults to False.
+    """
+    process.wait()
+    if remove_script:
+        os.remove(f'{path}/{script}')
+
+def _run_magic(lines : list[str], path : str, script : str, remove_script = False):
+    """Run the commands <lines> in a single (batch) session of magic.
+
+    Args:
+        lines (list[str]): Commands which shall be executed.
+        path (str): Path in which magic shall be executed, and the script gets stored.
+        script (str): File name of the tcl script.
+        remove_script (bool, optional): If True, the script will be deleted after the execution. Defaults to False.
+
+    Raises:
+        KeyError: If the variable PDKPATH isn't set.
+    """
+    process = _start_magic(lines, path, script)
+    _wait_magic(process, path, script, remove_script)
+
+def _remove_mag_files(path : str):
+    """Delete the magic-views (.mag files) at <path>.
+        The entries of os.scandir cache the file type,
+        so no additional stat is needed per file.
+
+    Args:
+        path (str): Path of the magic-views.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith('.mag') and entry.is_file():
+                os.unlink(entry.path)
+
 def instantiate_circuit(Circuit : Circuit, path='Magic/Devices'):
     """Instantiate the devices of the given circuit, and all its possible
      sub-circuits in magic.
@@ -50,23 +155,17 @@ def instantiate_circuit(Circuit : Circuit, path='Magic/Devices'):
     logger.info(f"Instantiating {Circuit} in magic.")
 
     #get the topology of the circuit
-    topology = get_top_down_topology(Circuit)
-    topology.sort(key=lambda x: x[0])
+    topology = get_precomputed_topology(Circuit)
 
     logger.debug(f"Instantiation topology: {topology}")
 
-    #if Devices folder exists delete it
-    if os.path.exists(path):
-        shutil.rmtree(path)
-
-    #make the Devices folder
-    if not os.path.exists(path):
-        os.makedirs(path)
+    #make the Devices folder, and delete existing magic-views
+    os.makedirs(path, exist_ok=True)
+    _remove_mag_files(path)
 
-    #for each circuit instantiate the devices
-    for (t, c) in topology:
-        instantiate_devices(c, path, del_path=False)
-        logger.debug(f"Instantiated devices of {c} at topological layer {t}.")
+    #instantiate the devices of all circuits in a single magic session
+    _instantiate_devices(topology, path)
+    logger.debug(f"Instantiated devices of {topology}.")
 
 def instantiate_devices(Circuit : Circuit, path = 'Magic/Devices', del_path = True):
     """Instantiate the devices of a circuit. (Without the devices of possible sub-circuits.)
@@ -79,41 +178,61 @@ def instantiate_devices(Circuit : Circuit, path = 'Magic/Devices', del_path = Tr
         del_path (bool, optional): If the content at <path> shall be deleted, before the instantiation. Defaults to True.
     """
     logger.info(f"Instantiating devices of {Circuit} in magic. Devices-path: {path}")
-    
-    #get the device generation commands
-    mag = Magic(Circuit)
-    lines = mag.gen_devices()
-
-    #if devices folder exists delete it
-    if os.path.exists(path) and del_path:
-        shutil.rmtree(path)
 
     #make the devices folder
-    if not os.path.exists(path):
-        os.makedirs(path)
+    os.makedirs(path, exist_ok=True)
+
+    #delete existing magic-views
+    if del_path:
+        _remove_mag_files(path)
 
-    #write a tcl script to generate the devices
-    file = open(path+'/init_devs.tcl', 'w')
-    for l in lines:
-        file.write(l+'\n')
-    file.close()
+    _instantiate_devices([Circuit], path)
+
+def _instantiate_devices(circuits : list[Circuit], path : str, devices : set[str] = None, wait = True) -> subprocess.Popen|None:
+    """Instantiate the devices of the circuits <circuits> in a single magic session.
+        (Without the devices of possible sub-circuits, which aren't in <circuits>.)
+
+    Args:
+        circuits (list[Circuit]): Circuits which shall be instantiated in magic.
+        path (str): Existing path where the resulting files, will be saved.
+        devices (set[str], optional): Names of the devices which shall be instantiated. Circuits without 
+                                    such devices are skipped. Defaults to None, to instantiate all devices.
+        wait (bool, optional): If False, the magic session isn't awaited, and has to be awaited
+                                with _wait_magic(process, path, 'init_devs.tcl'). Defaults to True.
+
+    Returns:
+        subprocess.Popen|None: The running magic process, if <wait> is False and devices get instantiated.
+    """
+    if not (devices is None):
+        circuits = [c for c in circuits if not devices.isdisjoint(c.devices)]
+
+    #get the device generation commands
+    lines = []
+    for c in circuits:
+        mag = Magic(c)
+        lines.extend(mag.gen_devices(quit=False, subset=devices))
+    
+    if not lines:
+        return None
+    lines.append("quit -noprompt")
 
     #let magic generate the devices
-    # check if the variable PDKPATH is set
-    if "PDKPATH" in os.environ:
-        #save the actual directory
-        act_dir = os.getcwd()
-        os.chdir(path)
-        os.system('magic -dnull -noconsole -rcfile ${PDKPATH}/libs.tech/magic/sky130A.magicrc "init_devs.tcl" > /dev/null')
-        os.chdir(act_dir)
-    else:
-        raise KeyError(f"[ERROR] Variable PDKPATH not set!")
+    process = _start_magic(lines, path, 'init_devs.tcl')
     
-    #if the circuit has already a cell view, update the paths
-    for device in Circuit.devices.values():
-        if not (device.cell is None):
-            if type(device.cell)==Cell:
-                device.cell.add_path(os.path.realpath(f'{path}'))
+    #if the circuits have already a cell view, update the paths
+    # while magic is running
+    abs_path = _realpath(path)
+    for c in circuits:
+        for device in c.devices.values():
+            if not (device.cell is None):
+                if type(device.cell)==Cell and device.cell.path != abs_path:
+                    device.cell.add_path(abs_path)
+
+    if not wait:
+        return process
+    
+    _wait_magic(process, path, 'init_devs.tcl')
+    return None
 
 def generate_cell(name : str, path='Magic/Devices') -> Cell:
     """Generate a Cell-view.
@@ -143,42 +262,79 @@ def generate_cell(name : str, path='Magic/Devices') -> Cell:
     cell = Cell(name, layers)
     
     #add the path to the cell
-    cell.add_path(os.path.realpath(f'{path}'))
+    cell.add_path(_realpath(path))
     #cell.add_path(f'..{path[5:]}/')
 
     logger.debug(f"Generated cell {cell}.")
 
     return cell 
 
+def _collect_needed_cells(circ : Circuit, path : str) -> list[tuple[str, Device]]:
+    """Get the devices of circuit <circ> and its sub-circuits, whose magic-view is missing.
+
+    Args:
+        circ (Circuit): Circuit to be checked.
+        path (str): Path to the magic-view of the devices.
+
+    Returns:
+        list[tuple[str, Device]]: List of (device name, device) without magic-view.
+    """
+    needed = []
+    for c in get_precomputed_topology(circ):
+        for (d_name, d) in c.devices.items():
+            if type(d) is not SubDevice and not os.path.exists(f'{path}/{d_name}.mag'):
+                needed.append((d_name, d))
+    return needed
+
 def add_cells(circ : Circuit, path='Magic/Devices'):
     """Add a cell-view to the circuit.
+        Missing magic-views get generated before.
 
     Args:
         circ (Circuit): Circuit whose cell-view shall be generated.
         path (str, optional): Path to the magic-view of the devices. Defaults to 'Magic/Devices'.
     """
+    topology = get_precomputed_topology(circ)
 
-    try:
-        topology = get_top_down_topology(circ)
-        topology.sort(key=lambda x: x[0])
-
-        for (t, c) in topology:
-            for (d_name, d) in c.devices.items():
-                if type(d) is not SubDevice:
-                    cell_path = path
-                    cell = generate_cell(d_name, cell_path)
-                    d.set_cell(cell)
-    except FileNotFoundError:
+    #generate only the missing magic-views, in the background
+    needed = set(d_name for (d_name, d) in _collect_needed_cells(circ, path))
+    process = None
+    if needed:
         print(f"Magic-view can't be found!")
         print(f"Generating new view under '{path}'!")
-        instantiate_circuit(circ, path)
-        add_cells(circ=circ, path=path)
-    except:
-        print(f"Adding cells to {circ} failed!")
-        sys.exit(1)
-                
-
-def place_circuit(name : str, Circuit : Circuit, path = 'Magic/Placement', debug=False, clean_path=True):
+        os.makedirs(path, exist_ok=True)
+        process = _instantiate_devices(topology, path, devices=needed, wait=False)
+
+    try:
+        #collect the devices which need a cell-view
+        items = [(d_name, d) for c in topology for (d_name, d) in c.devices.items() if type(d) is not SubDevice]
+        existing = [(d_name, d) for (d_name, d) in items if not (d_name in needed)]
+        missing = [(d_name, d) for (d_name, d) in items if d_name in needed]
+
+        #parse the magic-views in a thread pool, the parsing itself holds the GIL,
+        # but the file reads overlap with the parsing and with the running magic session
+        max_workers = min(32, (os.cpu_count() or 1)*4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            #parse the existing views, while magic generates the missing ones
+            cells = list(executor.map(lambda item: generate_cell(item[0], path), existing))
+            
+            if not (process is None):
+                _wait_magic(process, path, 'init_devs.tcl')
+                process = None
+            cells.extend(executor.map(lambda item: generate_cell(item[0], path), missing))
+
+        #set the cells in the main thread
+        for ((d_name, d), cell) in zip(existing+missing, cells):
+            d.set_cell(cell)
+    except Exception:
+        logger.exception(f"Adding cells to {circ} failed!")
+        raise
+    finally:
+        #don't leave a running magic session behind
+        if not (process is None):
+            process.wait()
+
+def place_circuit(name : str, Circuit : Circuit, path = 'Magic/Placement', debug=False, clean_path=True, cells : dict[str, Cell] = None, batch : list[str] = None):
     """Place the devices of circuit <Circuit> in magic.
 
     Args:
@@ -187,39 +343,37 @@ def place_circuit(name : str, Circuit : Circuit, path = 'Magic/Placement', debug
         path (str, optional): Path to the resulting top-cell. Defaults to 'Magic/Placement'.
         debug (bool, optional): If True, only the tcl script will be generated, but not executed. Defaults to False.
         clean_path (bool, optional): If True, the content at <path> will be deleted, before stating the placement. Defaults to True.
+        cells (dict[str, Cell], optional): Cell-views which shall be placed instead of the devices cells. 
+                                            key: Name of the device, value: Cell. Defaults to None.
+        batch (list[str], optional): If specified, the commands get appended to <batch> instead of being executed, 
+                                    to place multiple circuits in a single magic session. Defaults to None.
     """
 
     #generate the commands to place the circuit
     mag = Magic(Circuit)
-    lines = mag.place_circuit(name,path="")
-
-    #if Placement folder exists delete it
-    if os.path.exists(path) and clean_path:
-        shutil.rmtree(path)
+    lines = mag.place_circuit(name, path="", cells=cells, batch=batch is not None)
 
     #make the Placement folder
-    if not os.path.exists(path):
-        os.makedirs(path)
-
-    #write the tcl script to generate the Placement
-    file = open(path+'/place_devs.tcl', 'w')
-    for l in lines:
-        file.write(l+'\n')
-    file.close()
-
-    if not debug:
-        # check if the variable PDKPATH is set
-        if "PDKPATH" in os.environ:
-            #let magic generate the devices
-            act_dir = os.getcwd()
-            os.chdir(path)
-            os.system('magic -dnull -noconsole -rcfile ${PDKPATH}/libs.tech/magic/sky130A.magicrc "place_devs.tcl" > /dev/null')
-            #delete the tcl script
-            os.remove("place_devs.tcl")
-            os.chdir(act_dir)
-        else:
-            raise KeyError(f"[ERROR] Variable PDKPATH not set!")
-        
+    os.makedirs(path, exist_ok=True)
+
+    #delete existing magic-views
+    if clean_path:
+        _remove_mag_files(path)
+
+    if batch is not None:
+        #delete a stale magic-view of the top-cell, since it would be loaded by magic
+        try:
+            os.remove(f'{path}/{name}.mag')
+        except FileNotFoundError:
+            pass
+        batch.extend(lines)
+    elif debug:
+        #only write the tcl script to generate the Placement
+        _write_tcl_script(lines, path, 'place_devs.tcl')
+    else:
+        #let magic place the devices
+        _run_magic(lines, path, 'place_devs.tcl', remove_script=True)
+
     
 def place_circuit_hierachical(name : str, circuit : Circuit, path = "Magic/Placement", clean_path = True):
     """Do the placement of a circuit hierarchical.
@@ -233,33 +387,39 @@ def place_circuit_hierachical(name : str, circuit : Circuit, path = "Magic/Place
         clean_path (bool, optional): True, if the path should be cleaned before placing the devices. Defaults to True.
     """
     
-    #if Placement folder exists delete it
-    if os.path.exists(path) and clean_path:
-        shutil.rmtree(path)
-
     #make the Placement folder
-    if not os.path.exists(path):
-        os.makedirs(path)
+    os.makedirs(path, exist_ok=True)
 
-    topology = get_bottom_up_topology(circuit)
+    #delete existing magic-views
+    if clean_path:
+        _remove_mag_files(path)
 
-    #sort the topology in descent order (starting with the lowest)
-    topology.sort(key=lambda x : x[0], reverse=True)
+    #get the topology in bottom-up order (starting with the lowest)
+    topology = get_precomputed_topology(circuit, bottom_up=True)
+    abs_path = _realpath(path)
 
-    for (topology_layer, circ) in topology:
+    #collect the commands of all circuits
+    batch = []
+    for circ in topology:
         if type(circ) == SubCircuit:
             #get the subdevice
-            circ_c = copy.deepcopy(circ)
-            sub_device = circ_c.sub_device
-            macro_cell = sub_device.cell
+            sub_device = circ.sub_device
+            # copy only the geometry of the macro-cell and its internal cells, 
+            # since the cells get moved
+            macro_cell = sub_device.cell.clone_geometry()
             #center the macro-cell
             macro_cell.move_center((0,0))
             macro_cell.rotate_center(-macro_cell.rotation)
             macro_cell._move_cells_to_bound()
-            #place the subcircuit
-            place_circuit(sub_device.name, circ_c, path=path, clean_path=False)
+            #place the subcircuit with the centered cells
+            cells = {c.device.name : c for c in macro_cell.cells}
+            place_circuit(sub_device.name, circ, path=path, clean_path=False, cells=cells, batch=batch)
 
-            circ.sub_device.cell.add_path(os.path.realpath(f'{path}'))
+            circ.sub_device.cell.add_path(abs_path)
         else:
-            place_circuit(name, circ, path=path, clean_path=False)
+            place_circuit(name, circ, path=path, clean_path=False, batch=batch)
+    
+    #let magic place all circuits in a single session
+    batch.append("quit -noprompt")
+    _run_magic(batch, path, 'place_devs.tcl', remove_script=True)
 
@@ -63,6 +63,13 @@ class Circuit:
         self._nets = {}
         #save the topological layer
         self._topology_layer = topology_layer
+        #track modifications of the devices, to invalidate cached topologies
+        self._topology_version = 0
+        #store the top-down and bottom-up order of the circuit-hierarchy,
+        # and the topology version they were computed for (see SchematicCapture.utils.precompute_topology)
+        self._td_topo = None
+        self._bu_topo = None
+        self._topo_cache_version = None
         
         #instantiate the devices
         self._instantiate_devices()
@@ -71,6 +78,19 @@ class Circuit:
 
     def __eq__(self, __value: object) -> bool:
         return isinstance(__value, Circuit) and (self._name == __value._name)
+
+    def __setstate__(self, state : dict):
+        """Restore a pickled circuit.
+            Circuits pickled by older versions get the default topology attributes.
+
+        Args:
+            state (dict): Pickled attributes of the circuit.
+        """
+        state.setdefault("_topology_version", 0)
+        state.setdefault("_td_topo", None)
+        state.setdefault("_bu_topo", None)
+        state.setdefault("_topo_cache_version", None)
+        self.__dict__.update(state)
     
     def __hash__(self) -> int:
         return hash(self._name)
@@ -133,6 +153,17 @@ class Circuit:
         """
         return self._topology_layer
 
+    @property
+    def topology_version(self) -> int:
+        """Get the version of the circuits topology.
+            The version gets incremented, each time the devices of the circuit
+            or of one of its sub-circuits are modified.
+
+        Returns:
+            int: Version of the topology.
+        """
+        return self._topology_version
+
     @property
     def name(self) -> str:
         """Get the name of the circuit.
@@ -271,6 +302,17 @@ class Circuit:
         #update the modified circuit graph
         self.update_circuit_graph()
 
+        #invalidate cached topologies
+        self._invalidate_topology()
+
+    def _invalidate_topology(self):
+        """Increment the topology version of the circuit and of all its parent-circuits.
+        """
+        circ = self
+        while circ is not None:
+            circ._topology_version += 1
+            circ = getattr(circ, "parent_circuit", None)
+
     def map_devices_to_netlist(self) -> dict[str, Device]:
         """Get the devices without their suffix.
 
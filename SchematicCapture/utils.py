@@ -134,6 +134,86 @@ def get_top_down_topology(circ : Circuit) -> list[tuple[int, Circuit]]:
 
     return topology
 
+def get_top_down_topology_ordered(circ : Circuit) -> list[Circuit]:
+    """Get the circuits of the hierarchy of circuit <circ> in a top-down order.
+        Each circuit is listed before its sub-circuits. The order is obtained by 
+        a reversed post-order of an iterative depth-first search, such that no 
+        sorting by the topological layer is needed.
+
+    Args:
+        circ (Circuit): Circuit whose topology is to be identified.
+
+    Returns:
+        list[Circuit]: List of circuits, starting with <circ>.
+
+    Example:
+        For the circuit DBuf of get_top_down_topology:
+        Resulting list: [Circuit(DBuf), Circuit(x1), Circuit(x2), Circuit(x3), Circuit(x1_x3), Circuit(x2_x3)]
+    """
+    ordered = []
+    #sub-circuits of the same type share their name (and hash), 
+    # therefore track the visited circuits by their id
+    visited = set()
+    stack = [(circ, False)]
+
+    while stack:
+        c, expanded = stack.pop()
+        if expanded:
+            #all sub-circuits of c are finished
+            ordered.append(c)
+            continue
+        
+        if id(c) in visited:
+            continue
+        visited.add(id(c))
+
+        #finish c after its sub-circuits
+        stack.append((c, True))
+        for d in c.devices.values():
+            if type(d) is SubDevice and id(d._circuit) not in visited:
+                stack.append((d._circuit, False))
+    
+    #reverse the post-order to get the top-down order
+    ordered.reverse()
+    return ordered
+
+def precompute_topology(circ : Circuit) -> list[Circuit]:
+    """Compute the top-down and the bottom-up order of the circuits of <circ>, 
+        and store them at the circuit. The stored orders stay valid, 
+        until the devices of the circuit get modified.
+
+    Args:
+        circ (Circuit): Circuit whose topology is to be identified.
+
+    Returns:
+        list[Circuit]: Circuits in top-down order.
+    """
+    top_down = get_top_down_topology_ordered(circ)
+    
+    circ._td_topo = top_down
+    #the reversed top-down order is a bottom-up order
+    circ._bu_topo = list(reversed(top_down))
+    circ._topo_cache_version = circ.topology_version
+
+    return top_down
+
+def get_precomputed_topology(circ : Circuit, bottom_up = False) -> list[Circuit]:
+    """Get the stored order of the circuits of <circ>.
+        If the order isn't stored or outdated, it will be computed.
+
+    Args:
+        circ (Circuit): Circuit whose topology is to be identified.
+        bottom_up (bool, optional): If True, the bottom-up order will be returned, 
+                                    otherwise the top-down order. Defaults to False.
+
+    Returns:
+        list[Circuit]: Circuits in top-down or bottom-up order. Shall not be modified.
+    """
+    if circ._topo_cache_version != circ.topology_version:
+        precompute_topology(circ)
+    
+    return circ._bu_topo if bottom_up else circ._td_topo
+
 def get_bottom_up_topology(circ : Circuit) -> list[tuple[int, Circuit]]:
     """Get the topology of the circuit <circ> in a bottom-up fashion.
 
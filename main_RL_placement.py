@@ -22,12 +22,13 @@
 import faulthandler
 faulthandler.enable()
 
-from SchematicCapture.utils import setup_circuit, include_primitives_hierarchical
+from SchematicCapture.utils import setup_circuit, include_primitives_hierarchical, precompute_topology
 from Magic.utils import instantiate_circuit, add_cells
-from Environment.utils import do_bottom_up_placement
 from SchematicCapture.RString import include_RStrings_hierarchical
-from Magic.MagicDie import MagicDie
 import pickle
+import tempfile
+import os
+import sys
 
 import logging
 from logging.handlers import RotatingFileHandler
@@ -65,6 +66,14 @@ def main():
     net_rules_file_name = input(f"Enter the net rules file name (default: net_rules_{DEFAULT_CIRCUIT_NAME}): ") or f"net_rules_{DEFAULT_CIRCUIT_NAME}"
     net_rules_file = f"NetRules/{net_rules_file_name}.json"
 
+    # Import the RL-environment and the die lazily, since the environment pulls in torch
+    try:
+        from Environment.utils import do_bottom_up_placement
+        from Magic.MagicDie import MagicDie
+    except ImportError as e:
+        print(f"Importing the placement environment failed: {e}")
+        sys.exit(1)
+
     print("Setting up the circuit...")
     # Setup the circuit
     C = setup_circuit(circuit_file, circuit_name, [], net_rules_file=net_rules_file)
@@ -76,6 +85,9 @@ def main():
     include_RStrings_hierarchical(C)
     print("Primitive compositions included.")
 
+    # Compute the order of the (sub-)circuits once, for all following steps
+    precompute_topology(C)
+
     # Instantiate the circuit cells in magic
     if INSTANTIATE_CELLS_IN_MAGIC:
         print("Instantiating the circuit cells in Magic...")
@@ -99,9 +111,26 @@ def main():
 
     print("Saving the placed circuit...")
     # Save the placed circuit
-    file = open(f"PlacementCircuits/{circuit_name}_placement.pkl", 'wb')
-    pickle.dump(die, file)
-    file.close()
+    # Write to a temporary file first and replace the result atomically,
+    # such that a crash can't leave a truncated placement behind
+    file = tempfile.NamedTemporaryFile('wb', dir="PlacementCircuits", suffix=".tmp", delete=False)
+    try:
+        with file:
+            pickle.dump(die, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+
+            # The temporary file is only accessible by the owner,
+            # give it the default permissions of a new file
+            umask = os.umask(0)
+            os.umask(umask)
+            os.fchmod(file.fileno(), 0o666 & ~umask)
+
+        os.replace(file.name, f"PlacementCircuits/{circuit_name}_placement.pkl")
+    except BaseException:
+        # Don't leave the temporary file behind
+        os.unlink(file.name)
+        raise
     print("Placed circuit saved.")
     
 